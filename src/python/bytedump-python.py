@@ -8,14 +8,17 @@
 # ----------------------------------------------------------------------
 #
 
-import inspect
+from __future__ import annotations
+
 import locale
 import os
 import re
 import sys
 
-from io import BytesIO, StringIO, UnsupportedOperation
-from typing import Any, BinaryIO
+from binascii import hexlify
+from io import BytesIO, TextIOBase, UnsupportedOperation
+from types import FrameType
+from typing import Any, BinaryIO, Callable
 
 #
 # The source code is organized into sections that are discussed next. All of the
@@ -36,6 +39,12 @@ from typing import Any, BinaryIO
 #       discussed in the comments right before they're used in declarations. If
 #       you're curious don't worry - you won't be able to miss the strange names.
 #
+#       NOTE - they're deliberately left as class variables, rather than being moved
+#       into something like a slotted dataclass, because that's how the Java version
+#       organizes them. None of them are touched in the loops that generate the dump,
+#       because the dump methods copy everything they need into local variables before
+#       those loops start.
+#
 #    ByteDump Methods
 #       These are the Python class methods that "correspond" to functions that can
 #       be found in the "Script Functions" section of the bash version of bytedump
@@ -215,13 +224,19 @@ class ByteDump:
     # that xxd (and other similar programs) generate. Unprintable ASCII characters and
     # all bytes with their top bit set are represented by a period in the TEXT field.
     #
-    # NOTE - even though they're Python lists the ones that are used to map individual
-    # bytes (i.e., the numbers) to the strings that are supposed to appear in the TEXT
-    # and BYTE fields in our dump will be called "mapping arrays" rather than "mapping
-    # lists".
+    # NOTE - even though they're Python lists (or tuples) the ones that are used to map
+    # individual bytes (i.e., the numbers) to the strings that are supposed to appear in
+    # the TEXT and BYTE fields in our dump will be called "mapping arrays" rather than
+    # "mapping lists".
+    #
+    # NOTE - the four TEXT field mapping arrays declared here are tuples, so they can't
+    # be modified by accident. They're templates that are created once, when the class
+    # is loaded, and initialize4_maps() always builds the list that's used in the dump
+    # from a copy of one of them. They can't be bytes, because the Unicode escapes they
+    # contain can't be expanded until we know the encoding that's used for the output.
     #
 
-    ASCII_TEXT_MAP: list[str] = [
+    ASCII_TEXT_MAP: tuple[str, ...] = (
         #
         # Basic Latin Block (ASCII)
         #
@@ -265,7 +280,7 @@ class ByteDump:
            ".",        ".",        ".",        ".",        ".",        ".",        ".",        ".",
            ".",        ".",        ".",        ".",        ".",        ".",        ".",        ".",
            ".",        ".",        ".",        ".",        ".",        ".",        ".",        ".",
-    ]
+    )
 
     #
     # The UNICODE_TEXT_MAP mapping array is a modified version of the ASCII mapping
@@ -275,7 +290,7 @@ class ByteDump:
     # handled in the ASCII_TEXT_MAP mapping array.
     #
 
-    UNICODE_TEXT_MAP: list[str] = [
+    UNICODE_TEXT_MAP: tuple[str, ...] = (
         #`
         # Basic Latin Block (ASCII)
         #
@@ -319,7 +334,7 @@ class ByteDump:
         "\\u00E8",  "\\u00E9",  "\\u00EA",  "\\u00EB",  "\\u00EC",  "\\u00ED",  "\\u00EE",  "\\u00EF",
         "\\u00F0",  "\\u00F1",  "\\u00F2",  "\\u00F3",  "\\u00F4",  "\\u00F5",  "\\u00F6",  "\\u00F7",
         "\\u00F8",  "\\u00F9",  "\\u00FA",  "\\u00FB",  "\\u00FC",  "\\u00FD",  "\\u00FE",  "\\u00FF",
-    ]
+    )
 
     #
     # The CARET_TEXT_MAP mapping array maps bytes into printable two character strings
@@ -336,7 +351,7 @@ class ByteDump:
     # but as far as I know it's just my own convention.
     #
 
-    CARET_TEXT_MAP: list[str] = [
+    CARET_TEXT_MAP: tuple[str, ...] = (
         #
         # Basic Latin Block (ASCII)
         #
@@ -380,7 +395,7 @@ class ByteDump:
         " \\u00E8",  " \\u00E9",  " \\u00EA",  " \\u00EB",  " \\u00EC",  " \\u00ED",  " \\u00EE",  " \\u00EF",
         " \\u00F0",  " \\u00F1",  " \\u00F2",  " \\u00F3",  " \\u00F4",  " \\u00F5",  " \\u00F6",  " \\u00F7",
         " \\u00F8",  " \\u00F9",  " \\u00FA",  " \\u00FB",  " \\u00FC",  " \\u00FD",  " \\u00FE",  " \\u00FF",
-    ]
+    )
 
     #
     # The CARET_ESCAPE_TEXT_MAP mapping array is a slightly modified version of the
@@ -389,7 +404,7 @@ class ByteDump:
     # using the caret notation that's already been described.
     #
 
-    CARET_ESCAPE_TEXT_MAP: list[str] = [
+    CARET_ESCAPE_TEXT_MAP: tuple[str, ...] = (
         #
         # Basic Latin Block (ASCII)
         #
@@ -433,7 +448,17 @@ class ByteDump:
         " \\u00E8",  " \\u00E9",  " \\u00EA",  " \\u00EB",  " \\u00EC",  " \\u00ED",  " \\u00EE",  " \\u00EF",
         " \\u00F0",  " \\u00F1",  " \\u00F2",  " \\u00F3",  " \\u00F4",  " \\u00F5",  " \\u00F6",  " \\u00F7",
         " \\u00F8",  " \\u00F9",  " \\u00FA",  " \\u00FB",  " \\u00FC",  " \\u00FD",  " \\u00FE",  " \\u00FF",
-    ]
+    )
+
+    #
+    # Matches elements in the TEXT field mapping arrays that end with the "\\uXXXX"
+    # escapes that initialize4_maps() expands. It's checked against every element of
+    # the selected array, so it's compiled once, when the class is loaded. The escape
+    # is always the last six characters of an element, so initialize4_maps() looks for
+    # the backslash and 'u' at that position before it bothers with this pattern.
+    #
+
+    UNICODE_ESCAPE: re.Pattern = re.compile(r"^(.*)(\\u([0-9a-fA-F]{4}))$")
 
     #
     # The implementation that was generated by Gemini included explicit declarations
@@ -596,6 +621,143 @@ class ByteDump:
         "RESET.attributes": "\u001B[0m"
     }
 
+    #
+    # Regular expressions used by options() to split arguments into option names and
+    # option arguments and to check the arguments of options that accept them. They
+    # used to be handed to RegexManager as strings, which meant a lookup in the cache
+    # of compiled patterns that the re module maintains every time an option was seen.
+    # Options that accept the same kind of argument share a pattern.
+    #
+    # OPTION_NAME is the two patterns that used to recognize long options, with and
+    # without an argument, collapsed into one. The name (including any '=') is group 1
+    # and the argument, which is empty when there's no '=', is group 2.
+    #
+    # OPTION_ADDR and OPTION_STYLE only check the syntax of the --addr, --byte, and
+    # --text arguments. The style names they pick out are checked by looking them up
+    # in the OPTION_*_STYLES dictionaries, so --byte and --text can share a pattern.
+    # OPTION_ADDR is separate because it accepts a decimal format width, rather than
+    # a record length.
+    #
+
+    OPTION_NAME: re.Pattern = re.compile("^(--[^=-][^=]*(?:[=]|$))(.*)$")
+    OPTION_ADDR: re.Pattern = re.compile("^[ \\t]*([a-zA-Z]+)[ \\t]*([:][ \\t]*([0]?[1-9][0-9]*)[ \\t]*)?$")
+    OPTION_ATTRIBUTE: re.Pattern = re.compile("^[ \\t]*([a-zA-Z]+([-][a-zA-Z]+)*)[ \\t]*([:][ \\t]*(.*))?$")
+    OPTION_COUNT: re.Pattern = re.compile("^[ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*$")
+    OPTION_SPACING: re.Pattern = re.compile("^[ \\t]*(1|single|2|double|3|triple)[ \\t]*$")
+    OPTION_STYLE: re.Pattern = re.compile("^[ \\t]*([a-zA-Z]+)[ \\t]*([:][ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*)?$")
+    OPTION_START: re.Pattern = re.compile("^[ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*([:][ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*)?$")
+
+    #
+    # The names that the --addr, --byte, and --text options accept for each field's
+    # style, mapped to the values options() saves in ADDR_output, BYTE_output, and
+    # TEXT_output, along with the record separators that each --spacing argument
+    # selects. options() translates those arguments with a single lookup in these
+    # dictionaries.
+    #
+
+    OPTION_ADDR_STYLES: dict[str, str] = {
+        "decimal": "DECIMAL",
+        "empty": "EMPTY",
+        "hex": "HEX-LOWER",
+        "HEX": "HEX-UPPER",
+        "octal": "OCTAL",
+        "xxd": "XXD"
+    }
+
+    OPTION_BYTE_STYLES: dict[str, str] = {
+        "binary": "BINARY",
+        "decimal": "DECIMAL",
+        "empty": "EMPTY",
+        "hex": "HEX-LOWER",
+        "HEX": "HEX-UPPER",
+        "octal": "OCTAL",
+        "xxd": "XXD"
+    }
+
+    OPTION_SPACING_SEPARATORS: dict[str, str] = {
+        "1": "\n",
+        "single": "\n",
+        "2": "\n\n",
+        "double": "\n\n",
+        "3": "\n\n\n",
+        "triple": "\n\n\n"
+    }
+
+    OPTION_TEXT_STYLES: dict[str, str] = {
+        "ascii": "ASCII",
+        "caret": "CARET",
+        "empty": "EMPTY",
+        "escape": "CARET_ESCAPE",
+        "unicode": "UNICODE",
+        "xxd": "XXD"
+    }
+
+    #
+    # Regular expressions used by byte_selector() to pick tokens out of the selectors
+    # that are handed to attribute options (e.g., --foreground). The same patterns are
+    # used for every token in every selector, so they're all compiled once, when the
+    # class is loaded. RegexManager accepts them anywhere that it accepts a regular
+    # expression string.
+    #
+    # SELECTOR_C_INTEGER_RANGE is what's used to pick integers out of selectors that
+    # don't have a base prefix. It's the C style hex, octal, and decimal patterns glued
+    # together, in that order, so one match both extracts an integer range and tells
+    # us its base - groups 1 and 2 are hex, 3 and 4 are octal, and 5 and 6 are decimal.
+    # SELECTOR_INTEGER is only needed when the number pattern fails, to decide whether
+    # the token was a malformed integer.
+    #
+    # NOTE - all of them, except SELECTOR_BASE_PREFIX, are used by matched_at() to match
+    # tokens that start somewhere in the middle of a selector, so they're anchored by
+    # where the match starts rather than by a leading "^".
+    #
+
+    SELECTOR_BASE_PREFIX: re.Pattern = re.compile("^[ \\t]*(0[xX]?)?[(](.*)[)][ \\t]*$")
+    SELECTOR_TOKEN: re.Pattern = re.compile("[ \\t]*([^ \\t].*)")
+    SELECTOR_INTEGER: re.Pattern = re.compile("(0[xX]?)?[0-9a-fA-F]")
+    SELECTOR_HEX_RANGE: re.Pattern = re.compile("(([0-9a-fA-F]+)([-]([0-9a-fA-F]+))?)([ \\t]+|$)")
+    SELECTOR_OCTAL_RANGE: re.Pattern = re.compile("(([0-7]+)([-]([0-7]+))?)([ \\t]+|$)")
+    SELECTOR_DECIMAL_RANGE: re.Pattern = re.compile("(([1-9][0-9]*)([-]([1-9][0-9]*))?)([ \\t]+|$)")
+    SELECTOR_C_INTEGER_RANGE: re.Pattern = re.compile(
+        "(?:0[xX]([0-9a-fA-F]+)(?:[-]0[xX]([0-9a-fA-F]+))?|(0[0-7]*)(?:[-](0[0-7]*))?|([1-9][0-9]*)(?:[-]([1-9][0-9]*))?)([ \\t]+|$)"
+    )
+    SELECTOR_CLASS_START: re.Pattern = re.compile("\\[:")
+    SELECTOR_CLASS: re.Pattern = re.compile("\\[:([a-zA-Z0-9]+):\\]([ \\t]+|$)")
+    SELECTOR_RAW_PREFIX: re.Pattern = re.compile("(r([#]*)(\"|'))")
+    SELECTOR_RAW_TAIL: re.Pattern = re.compile("([ \\t]|$)")
+
+    #
+    # The character classes that byte_selector() recognizes, along with the bytes each
+    # one selects, which are stored as tuples of closed integer ranges. Looking a class
+    # up here means the bytes are known immediately, without recursive byte_selector()
+    # calls that would parse a hex selector string with the regular expressions above.
+    #
+
+    SELECTOR_CHARACTER_CLASSES: dict[str, tuple[tuple[int, int], ...]] = {
+        #
+        # POSIX character class names - these hex mappings were all generated
+        # by debugging code in the Java bytedump implementation.
+        #
+        "alnum": ((0x30, 0x39), (0x41, 0x5A), (0x61, 0x7A), (0xAA, 0xAA), (0xB5, 0xB5), (0xBA, 0xBA), (0xC0, 0xD6), (0xD8, 0xF6), (0xF8, 0xFF)),
+        "alpha": ((0x41, 0x5A), (0x61, 0x7A), (0xAA, 0xAA), (0xB5, 0xB5), (0xBA, 0xBA), (0xC0, 0xD6), (0xD8, 0xF6), (0xF8, 0xFF)),
+        "blank": ((0x09, 0x09), (0x20, 0x20), (0xA0, 0xA0)),
+        "cntrl": ((0x00, 0x1F), (0x7F, 0x9F)),
+        "digit": ((0x30, 0x39),),
+        "graph": ((0x21, 0x7E), (0xA1, 0xFF)),
+        "lower": ((0x61, 0x7A), (0xAA, 0xAA), (0xB5, 0xB5), (0xBA, 0xBA), (0xDF, 0xF6), (0xF8, 0xFF)),
+        "print": ((0x20, 0x7E), (0xA0, 0xFF)),
+        "punct": ((0x21, 0x23), (0x25, 0x2A), (0x2C, 0x2F), (0x3A, 0x3B), (0x3F, 0x40), (0x5B, 0x5D), (0x5F, 0x5F), (0x7B, 0x7B), (0x7D, 0x7D), (0xA1, 0xA1), (0xA7, 0xA7), (0xAB, 0xAB), (0xB6, 0xB7), (0xBB, 0xBB), (0xBF, 0xBF)),
+        "space": ((0x09, 0x0D), (0x20, 0x20), (0x85, 0x85), (0xA0, 0xA0)),
+        "upper": ((0x41, 0x5A), (0xC0, 0xD6), (0xD8, 0xDE)),
+        "xdigit": ((0x30, 0x39), (0x41, 0x46), (0x61, 0x66)),
+
+        #
+        # Custom character class names.
+        #
+        "ascii": ((0x00, 0x7F),),
+        "latin1": ((0x80, 0xFF),),
+        "all": ((0x00, 0xFF),),
+    }
+
     #
     # This will be an instance of the AttributeTables class, but I didn't want that
     # class to be the first one in this file, which would have been required if the
@@ -610,6 +772,22 @@ class ByteDump:
 
     attribute_tables = None
 
+    #
+    # Byte ranges that byte_selector() has already extracted from selectors, keyed by
+    # the selector string.
+    #
+
+    selector_cache: dict[str, tuple[tuple[int, int], ...]] = {}
+
+    #
+    # The encoding and error handler that output_bytes() uses when it turns the strings
+    # in the dump into bytes. dump() sets them right before the dump starts, because the
+    # stream that the bytes are written to decides what they should be.
+    #
+
+    output_encoding: str = "utf-8"
+    output_errors: str = "strict"
+
     #
     # Using the arguments_consumed class variable means command line option can be
     # handled in a way that resembles the bash version of this program. There are
@@ -652,6 +830,8 @@ class ByteDump:
                             #
                             # Want to read bytes from the file so we use "rb" when we
                             # open it. Using a with statement guarantees it's closed.
+                            # The dump is written to sys.stdout, and dump() picks the
+                            # stream it actually writes bytes to.
                             #
                             with open(arg, "rb") as input_stream:
                                 cls.dump(input_stream, sys.stdout)
@@ -672,36 +852,56 @@ class ByteDump:
         else:
             cls.user_error("too many non-option command line arguments:", delimit(args))
 
+    @classmethod
+    def attribute_option(cls, arg: str, optarg: str, layer: str, *keys: str) -> None:
+        attribute: str
+        key: str
+        manager: RegexManager
+        selector: str
+
+        #
+        # Handles the options, like --foreground or --text-background, that assign an
+        # attribute to the bytes picked out by an optional selector. The arg argument is
+        # the complete option, which is only used in error messages, optarg is what was
+        # supplied after the '=', layer is FOREGROUND or BACKGROUND, and keys name the
+        # attribute tables that the selected bytes are recorded in. A missing selector
+        # selects every byte.
+        #
+
+        manager = RegexManager()
+
+        if manager.matched(optarg, cls.OPTION_ATTRIBUTE):
+            attribute = manager.cached_groups[1]
+            selector = manager.cached_groups[4] if manager.cached_groups[3] is not None else "0x(00-FF)"
+            if f"{layer}.{attribute}" in cls.ANSI_ESCAPE:
+                for key in keys:
+                    cls.byte_selector(attribute, selector, cls.attribute_tables.get_table(key))
+            else:
+                cls.user_error(layer.lower() + " attribute", delimit(attribute), "in option", delimit(arg), "is not recognized")
+        else:
+            cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
+
     @classmethod
     def byte_selector(cls, attribute: str, tokens: str, output: list[str | None]) -> None:
-        base: int
-        body: str
-        chars: list[str | None]
-        code: int
-        count: int
         first: int
-        index: int
-        joined_chars: str
         last: int
-        manager: RegexManager
-        name: str
-        prefix: str
-        suffix: str
-        tail: str
-        tokens_start: str
+        ranges: tuple[tuple[int, int], ...] | None
 
         #
         # Called to parse a string that's supposed to assign an attribute (primarily
         # a color) to a group of bytes whenever any of them is displayed in the BYTE
-        # or TEXT fields of the dump that this program produces. There's some simple
-        # recursion used to implement "character classes" and "raw strings", but the
-        # initial call is always triggered by a command line option.
+        # or TEXT fields of the dump that this program produces. It's always called
+        # to process the selector in a command line option.
         #
         # The first argument is a string that identifies the attribute that the user
         # wants applied to the bytes selected by the second argument. This method's
         # job is to figure out the numeric values of the selected bytes and associate
         # the attribute (i.e., the first argument) with each byte's numeric value in
-        # the string array that's referenced by the third argument.
+        # the string array that's referenced by the third argument. The selector is
+        # parsed by byte_selector_ranges(), and the ranges of bytes that it returns
+        # are saved in selector_cache, so the same selector never has to be parsed
+        # twice. That happens all the time, because options like --foreground hand
+        # the same selector to this method for the BYTE and TEXT field tables.
         #
         # The second argument is the byte "selector" and it's processed using regular
         # expressions. The selector consists of space separated tokens that represent
@@ -741,8 +941,8 @@ class ByteDump:
         # POSIX standard. The last row are 3 character classes that I decided to
         # support because they seemed like a convenient way to select familiar (or
         # otherwise obvious) blocks of contiguous bytes. This program only deals with
-        # bytes, so it's easy to enumerate their members using integers and integer
-        # ranges, and that's exactly how this method uses recursion to implement
+        # bytes, so it's easy to enumerate their members using integer ranges, and
+        # that's exactly how the SELECTOR_CHARACTER_CLASSES dictionary implements the
         # character classes.
         #
         # A modified version of Rust's raw string literal can also be used as a token
@@ -762,24 +962,67 @@ class ByteDump:
         # that are less than 256. Two quoting styles are supported because the quote
         # delimiters have to be protected from your shell on the command line.
         #
+
+        ranges = cls.selector_cache.get(tokens)
+        if ranges is None:
+            ranges = cls.byte_selector_ranges(tokens)
+            cls.selector_cache[tokens] = ranges
+
+        #
+        # Slice assignment hands each range to the list in one step, which matters
+        # for classes like [:all:] that cover most or all of the table.
+        #
+
+        for first, last in ranges:
+            output[first:last + 1] = [attribute] * (last - first + 1)
+
+    @classmethod
+    def byte_selector_ranges(cls, tokens: str) -> tuple[tuple[int, int], ...]:
+        base: int
+        body: str
+        char: str
+        close: int
+        code: int
+        end: int
+        first: int
+        groups: tuple[str | None, ...]
+        last: int
+        manager: RegexManager
+        message: str
+        name: str
+        number: re.Pattern
+        pos: int
+        prefix: str
+        ranges: tuple[tuple[int, int], ...] | None
+        selected: list[tuple[int, int]]
+        start: int
+        suffix: str
+
+        #
+        # Parses the byte selector described in the comments at the start of the
+        # byte_selector() method and returns the bytes that it selects as a tuple
+        # of closed integer ranges that all fit in a byte. Any problem found in the
+        # selector is reported as a user error.
+        #
         # NOTE - this is a difficult method to follow, but similarity to what's done
         # in the other bytedump implementations should help if you decide to tackle
         # this method. Lots of regular expressions, but chatbots can help with them.
         #
         # NOTE - the RegexManager class defined later in this file saves a temporary
-        # copy of the matched groups whenever the manager.matched() method succeeds.
-        # Those groups can be accessed using the manager.cached_groups list and that
-        # copy sticks around until the next call of manager.matched().
+        # copy of the matched groups whenever the manager.matched() or matched_at()
+        # methods succeed. Those groups can be accessed using the manager.cached_groups
+        # list and that copy sticks around until the next call of either method.
         #
 
         manager = RegexManager()
+        selected = []
         base = 0
 
         #
         # First check for the optional base prefix.
         #
 
-        if manager.matched(tokens, "^[ \\t]*(0[xX]?)?[(](.*)[)][ \\t]*$"):
+        if manager.matched(tokens, cls.SELECTOR_BASE_PREFIX):
             prefix = manager.cached_groups[1]
             tokens = manager.cached_groups[2]
 
@@ -792,139 +1035,108 @@ class ByteDump:
             else:
                 cls.internal_error("selector base prefix", delimit(prefix), "has not been implemented")
 
-        while manager.matched(tokens, "^[ \\t]*([^ \\t].*)"):
-            tokens = manager.cached_groups[1]
-            tokens_start = tokens
-            if manager.matched(tokens, "^(0[xX]?)?[0-9a-fA-F]"):
-                first = 0
-                last = -1
+        #
+        # The tokens are scanned in place. Instead of slicing the tokens that have been
+        # processed off the front of the selector, pos tracks where the next token starts
+        # and end is where the current token (and everything after it) ends. That means
+        # tokens[pos:end] is the part of the selector that hasn't been processed yet, and
+        # it's only built when it's needed in an error message.
+        #
+
+        pos = 0
+        end = len(tokens)
+
+        #
+        # The base doesn't change once it's been picked, so neither does the pattern
+        # that's used to extract integer ranges or the message that's used when it
+        # can't. Any token that matches the number pattern also starts like an integer,
+        # so the SELECTOR_INTEGER check only has to run when that match fails.
+        #
+
+        if base == 16:
+            number = cls.SELECTOR_HEX_RANGE
+            message = "problem extracting a hex integer from"
+        elif base == 8:
+            number = cls.SELECTOR_OCTAL_RANGE
+            message = "problem extracting an octal integer from"
+        elif base == 10:
+            number = cls.SELECTOR_DECIMAL_RANGE
+            message = "problem extracting a decimal integer from"
+        else:
+            number = cls.SELECTOR_C_INTEGER_RANGE
+            message = "problem extracting an integer from"
+
+        while manager.matched_at(tokens, cls.SELECTOR_TOKEN, pos, end):
+            end = manager.cached_end
+            pos = end - len(manager.cached_groups[1])
+            if manager.matched_at(tokens, number, pos, end):
+                groups = manager.cached_groups
                 if base > 0:
-                    if base == 16:
-                        if manager.matched(tokens, "^(([0-9a-fA-F]+)([-]([0-9a-fA-F]+))?)([ \\t]+|$)"):
-                            first = int(manager.cached_groups[2], base)
-                            last = int(manager.cached_groups[4], base) if manager.cached_groups[4] is not None else first
-                            tokens = tokens[len(manager.cached_groups[0]):]
-                        else:
-                            cls.user_error("problem extracting a hex integer from", delimit(tokens_start))
-                    elif base == 8:
-                        if manager.matched(tokens, "^(([0-7]+)([-]([0-7]+))?)([ \\t]+|$)"):
-                            first = int(manager.cached_groups[2], base)
-                            last = int(manager.cached_groups[4], base) if manager.cached_groups[4] is not None else first
-                            tokens = tokens[len(manager.cached_groups[0]):]
-                        else:
-                            cls.user_error("problem extracting an octal integer from", delimit(tokens_start))
-                    elif base == 10:
-                        if manager.matched(tokens, "^(([1-9][0-9]*)([-]([1-9][0-9]*))?)([ \\t]+|$)"):
-                            first = int(manager.cached_groups[2], base)
-                            last = int(manager.cached_groups[4], base) if manager.cached_groups[4] is not None else first
-                            tokens = tokens[len(manager.cached_groups[0]):]
-                        else:
-                            cls.user_error("problem extracting a decimal integer from", delimit(tokens_start))
-                    else:
-                        cls.internal_error("base", delimit(str(base)), "has not been implemented")
+                    first = int(groups[2], base)
+                    last = int(groups[4], base) if groups[4] is not None else first
+                elif groups[1] is not None:
+                    first = int(groups[1], 16)
+                    last = int(groups[2], 16) if groups[2] is not None else first
+                elif groups[3] is not None:
+                    first = int(groups[3], 8)
+                    last = int(groups[4], 8) if groups[4] is not None else first
                 else:
-                    if manager.matched(tokens, "^(0[xX]([0-9a-fA-F]+)([-]0[xX]([0-9a-fA-F]+))?)([ \\t]+|$)"):
-                        first = int(manager.cached_groups[2], 16)
-                        last = int(manager.cached_groups[4], 16) if manager.cached_groups[4] is not None else first
-                        tokens = tokens[len(manager.cached_groups[0]):]
-                    elif manager.matched(tokens, "^((0[0-7]*)([-](0[0-7]*))?)([ \\t]+|$)"):
-                        first = int(manager.cached_groups[2], 8)
-                        last = int(manager.cached_groups[4], 8) if manager.cached_groups[4] is not None else first
-                        tokens = tokens[len(manager.cached_groups[0]):]
-                    elif manager.matched(tokens, "^(([1-9][0-9]*)([-]([1-9][0-9]*))?)([ \\t]+|$)"):
-                        first = int(manager.cached_groups[2], 10)
-                        last = int(manager.cached_groups[4], 10) if manager.cached_groups[4] is not None else first
-                        tokens = tokens[len(manager.cached_groups[0]):]
-                    else:
-                        cls.user_error("problem extracting an integer from", delimit(tokens_start))
+                    first = int(groups[5], 10)
+                    last = int(groups[6], 10) if groups[6] is not None else first
+                pos = manager.cached_end
                 if first <= last and first < 256:
-                    last = min(last, 255)
-                    for index in range(first, last + 1):
-                        output[index] = attribute
-            elif manager.matched(tokens, "^\\[:"):
-                if manager.matched(tokens, "^\\[:([a-zA-Z0-9]+):\\]([ \\t]+|$)"):
+                    selected.append((first, min(last, 255)))
+            elif manager.matched_at(tokens, cls.SELECTOR_INTEGER, pos, end):
+                cls.user_error(message, delimit(tokens[pos:end]))
+            elif manager.matched_at(tokens, cls.SELECTOR_CLASS_START, pos, end):
+                if manager.matched_at(tokens, cls.SELECTOR_CLASS, pos, end):
                     name = manager.cached_groups[1]
-                    tokens = tokens[len(manager.cached_groups[0]):]
+                    pos = manager.cached_end
 
-                    match name:
-                        #
-                        # POSIX character class names - these hex mappings were all generated
-                        # by debugging code in the Java bytedump implementation.
-                        #
-                        case "alnum":
-                            cls.byte_selector(attribute, "0x(30-39 41-5A 61-7A AA B5 BA C0-D6 D8-F6 F8-FF)", output)
-                        case "alpha":
-                            cls.byte_selector(attribute, "0x(41-5A 61-7A AA B5 BA C0-D6 D8-F6 F8-FF)", output)
-                        case "blank":
-                            cls.byte_selector(attribute, "0x(09 20 A0)", output)
-                        case "cntrl":
-                            cls.byte_selector(attribute, "0x(00-1F 7F-9F)", output)
-                        case "digit":
-                            cls.byte_selector(attribute, "0x(30-39)", output)
-                        case "graph":
-                            cls.byte_selector(attribute, "0x(21-7E A1-FF)", output)
-                        case "lower":
-                            cls.byte_selector(attribute, "0x(61-7A AA B5 BA DF-F6 F8-FF)", output)
-                        case "print":
-                            cls.byte_selector(attribute, "0x(20-7E A0-FF)", output)
-                        case "punct":
-                            cls.byte_selector(attribute, "0x(21-23 25-2A 2C-2F 3A-3B 3F-40 5B-5D 5F 7B 7D A1 A7 AB B6-B7 BB BF)", output)
-                        case "space":
-                            cls.byte_selector(attribute, "0x(09-0D 20 85 A0)", output)
-                        case "upper":
-                            cls.byte_selector(attribute, "0x(41-5A C0-D6 D8-DE)", output)
-                        case "xdigit":
-                            cls.byte_selector(attribute, "0x(30-39 41-46 61-66)", output)
-                        #
-                        # Custom character class names.
-                        #
-                        case "ascii":
-                            cls.byte_selector(attribute, "0x(00-7F)", output)
-                        case "latin1":
-                            cls.byte_selector(attribute, "0x(80-FF)", output)
-                        case "all":
-                            cls.byte_selector(attribute, "0x(00-FF)", output)
-                        case _:
-                            cls.user_error(delimit(name), "is not the name of an implemented character class")
+                    ranges = cls.SELECTOR_CHARACTER_CLASSES.get(name)
+                    if ranges is not None:
+                        selected.extend(ranges)
+                    else:
+                        cls.user_error(delimit(name), "is not the name of an implemented character class")
                 else:
-                    cls.user_error("problem extracting a character class from", delimit(tokens_start))
-            elif manager.matched(tokens, "^(r([#]*)(\"|'))"):
+                    cls.user_error("problem extracting a character class from", delimit(tokens[pos:end]))
+            elif manager.matched_at(tokens, cls.SELECTOR_RAW_PREFIX, pos, end):
+                start = pos
                 prefix = manager.cached_groups[1]
                 suffix = manager.cached_groups[3] + manager.cached_groups[2]
-                tokens = tokens[len(prefix):]
-                if manager.matched(tokens, suffix + "(.*)"):
-                    tail = manager.cached_groups[1]
-                    if manager.matched(tail, "^([ \\t]|$)"):
-                        body = tokens[:len(tokens) - (len(suffix) + len(tail))]
-                        tokens = tail
-
-                        chars = [None] * 256
-                        count = 0
-                        for index in range(len(body)):          # pylint: disable=consider-using-enumerate
-                            code = ord(body[index])
-                            if code < len(chars):
-                                if chars[code] is None:
-                                    count += 1
-                                chars[code] = f"{code:02X}"
-
-                        if count > 0:
-                            joined_chars = " ".join([c for c in chars if c is not None])
-                            cls.byte_selector(attribute, f"0x({joined_chars})", output)
+                pos = manager.cached_end
+                close = tokens.find(suffix, pos, end)
+                if close >= 0:
+                    if manager.matched_at(tokens, cls.SELECTOR_RAW_TAIL, close + len(suffix), end):
+                        body = tokens[pos:close]
+                        pos = close + len(suffix)
+
+                        #
+                        # Each distinct character in the body that's a byte is selected
+                        # directly, rather than by building a hex selector that would be
+                        # handed to a recursive byte_selector() call.
+                        #
+                        for char in set(body):
+                            code = ord(char)
+                            if code < 256:
+                                selected.append((code, code))
                     else:
-                        cls.user_error("all tokens must be space separated in byte selector", delimit(tokens_start))
+                        cls.user_error("all tokens must be space separated in byte selector", delimit(tokens[start:end]))
             else:
-                cls.user_error("no valid token found at the start of byte selector", delimit(tokens_start))
+                cls.user_error("no valid token found at the start of byte selector", delimit(tokens[pos:end]))
+
+        return tuple(selected)
 
     @classmethod
     def debug(cls, *args: str) -> None:
         arg: str
         buffer: list[str]
-        col: int
         consumed: dict[str, Any]
         key: str
         matched: list[str]
         prefix: str
         row: int
+        settings: dict[str, Any]
         tag: str
         value: Any
 
@@ -955,14 +1167,11 @@ class ByteDump:
                             #
                             # pylint: disable=unsubscriptable-object
                             #
-                            sys.stderr.write(f"[Debug] byte_map[{len(cls.byte_map)}]:\n")
+                            buffer = [f"[Debug] byte_map[{len(cls.byte_map)}]:\n"]
                             for row in range(16):
-                                prefix = "[Debug]    "
-                                for col in range(16):
-                                    sys.stderr.write(f"{prefix}{cls.byte_map[16 * row + col]}")
-                                    prefix = " "
-                                sys.stderr.write("\n")
-                            sys.stderr.write("\n")
+                                buffer.append("[Debug]    " + " ".join(map(str, cls.byte_map[16 * row:16 * row + 16])) + "\n")
+                            buffer.append("\n")
+                            sys.stderr.write("".join(buffer))
 
                 case "foreground":
                     if cls.DEBUG_foreground:
@@ -971,15 +1180,24 @@ class ByteDump:
 
                 case "settings":
                     if cls.DEBUG_settings:
+                        #
+                        # The class is only scanned once, and what's left are the names
+                        # and values of the attributes that aren't methods. Each prefix
+                        # then picks its keys out of that dictionary.
+                        #
+                        settings = {}
+                        for key in dir(cls):
+                            if hasattr(cls, key):
+                                value = getattr(cls, key)
+                                if not callable(value):
+                                    settings[key] = value
+
                         buffer = []
                         consumed = {}
                         for prefix in cls.DEBUG_settings_prefixes.split(" "):
-                            matched = []
-                            for key in dir(cls):
-                                if key not in consumed and key.startswith(prefix):
-                                    if hasattr(cls, key) and not callable(getattr(cls, key)):
-                                        matched.append(key)
-                                        consumed[key] = getattr(cls, key)
+                            matched = [key for key in settings if key not in consumed and key.startswith(prefix)]
+                            for key in matched:
+                                consumed[key] = settings[key]
 
                             if len(matched) > 0:
                                 matched.sort()
@@ -1004,17 +1222,21 @@ class ByteDump:
                             #
                             # pylint: disable=unsubscriptable-object
                             #
-                            sys.stderr.write(f"[Debug] text_map[{len(cls.text_map)}]:\n")
+                            buffer = [f"[Debug] text_map[{len(cls.text_map)}]:\n"]
                             for row in range(16):
-                                prefix = "[Debug]    "
-                                for col in range(16):
-                                    sys.stderr.write(f"{prefix}{cls.text_map[16 * row + col]}")
-                                    prefix = " "
-                                sys.stderr.write("\n")
-                            sys.stderr.write("\n")
+                                buffer.append("[Debug]    " + " ".join(map(str, cls.text_map[16 * row:16 * row + 16])) + "\n")
+                            buffer.append("\n")
+                            sys.stderr.write("".join(buffer))
 
     @classmethod
     def dump(cls, input_stream, output_stream) -> None:
+        buffer: BinaryIO | None
+        count: int | None
+        encoding: str
+        errors: str
+        remaining: int
+        sink: memoryview
+
         #
         # Responsible for important initialization, like seeking to the right spot in the
         # input_stream, loading the right number of bytes whenever the user wants to read
@@ -1029,13 +1251,73 @@ class ByteDump:
         # careful code duplication seemed worthwhile. If you disagree it should be trivial
         # to have dump_all() handle almost everything.
         #
+        # NOTE - the fields that appear in the dump are picked once, right here, by looking
+        # at DUMP_field_flags, so a dump that only has a BYTE or TEXT field never touches
+        # the other field's mapping array. What's left over in dump_all() are a few boolean
+        # tests that are made once per record, never once per byte, and adding even more
+        # specialized copies of that loop to eliminate them didn't seem worthwhile.
+        #
+        # NOTE - the dump methods write bytes. Every string they need, including the
+        # mapping arrays, is encoded once (by output_bytes()) before the loop that
+        # generates the dump starts, so nothing has to go through the text layer's
+        # encoder while the dump is being written.
+        #
 
         try:
+            #
+            # Binary streams get the bytes that print() would have written to standard
+            # output, which is also the encoding initialize4_maps() used when it decided
+            # which characters could be displayed in the TEXT field.
+            #
+            encoding = sys.stdout.encoding or "utf-8"
+            errors = sys.stdout.errors or "strict"
+
+            if isinstance(output_stream, TextIOBase):
+                #
+                # When we're handed standard output the dump is written to the binary
+                # stream that's underneath it, but only when the bytes we'd write are
+                # exactly what the text stream would have written. That means its
+                # encoding has to be stateless and ASCII compatible (e.g., no byte order
+                # marks), and no newline translation can happen. Anything that's still
+                # sitting in the text stream's buffer is flushed first.
+                #
+                # Every other text stream (e.g., utf-16 output, a file that was opened
+                # with its own encoding or newline, or io.StringIO) is wrapped in a
+                # TextStreamWriter. Strings are encoded using UTF-8, which can't lose
+                # anything, and TextStreamWriter decodes every block of bytes back into a
+                # string that's written to the text stream, so the stream's own encoder
+                # and newline translation still handle the dump.
+                #
+                output_stream.flush()
+                buffer = getattr(output_stream, "buffer", None)
+                encoding = output_stream.encoding or "utf-8"
+                errors = output_stream.errors or "strict"
+                if output_stream is sys.__stdout__ and buffer is not None and os.linesep == "\n" and is_byte_safe_encoding(encoding):
+                    output_stream = buffer
+                else:
+                    encoding = "utf-8"
+                    errors = "surrogatepass"
+                    output_stream = TextStreamWriter(output_stream, encoding, errors)
+
+            cls.output_encoding = encoding
+            cls.output_errors = errors
+
             if cls.DUMP_input_start > 0:
                 try:
                     input_stream.seek(cls.DUMP_input_start)
                 except UnsupportedOperation:
-                    input_stream.read(cls.DUMP_input_start)
+                    #
+                    # Streams, like pipes, that can't seek are skipped by reading bytes
+                    # into a small buffer that's reused until enough have been thrown
+                    # away, rather than reading everything we skip in one gulp.
+                    #
+                    remaining = cls.DUMP_input_start
+                    sink = memoryview(bytearray(min(remaining, cls.DUMP_input_maxbuf + 1)))
+                    while remaining > 0:
+                        count = input_stream.readinto(sink[:min(remaining, len(sink))])
+                        if not count:
+                            break
+                        remaining -= count
             if cls.DUMP_input_read > 0:
                 input_stream = BytesIO(input_stream.read(cls.DUMP_input_read))
 
@@ -1054,25 +1336,39 @@ class ByteDump:
     @classmethod
     def dump_all(cls, input_stream, output) -> None:
         addr_enabled: bool
-        addr_format: str
-        addr_prefix: str
-        addr_suffix: str
+        addr_format: bytes
+        addr_prefix: bytes
+        addr_suffix: bytes
         address: int
-        buffer: bytes
+        append: Callable[[bytes], None]
+        block: bytearray
+        block_len: int
+        buffer: bytearray
         byte_enabled: bool
-        byte_map: list[str] | None
+        byte_hex: str | None
+        byte_map: list[bytes] | None
         byte_pad_width: int
-        byte_prefix: str
-        byte_separator: str
-        byte_suffix: str
+        byte_prefix: bytes
+        byte_separator: bytes
+        byte_suffix: bytes
+        byte_upper: bool
         count: int
+        data: bytearray
+        field: bytes
+        lines: list[bytes]
+        offset: int
+        readinto: Callable[[bytearray], int]
         record_len: int
-        record_separator: str
+        record_separator: bytes
+        size: int
+        text: bytearray | None
         text_enabled: bool
-        text_map: list[str] | None
-        text_prefix: str
-        text_separator: str
-        text_suffix: str
+        text_map: list[bytes] | None
+        text_prefix: bytes
+        text_separator: bytes
+        text_suffix: bytes
+        text_table: bytes | None
+        write: Callable[[bytes], int]
 
         #
         # This is the primary dump method. Even though it can handle everything except
@@ -1085,6 +1381,8 @@ class ByteDump:
         # attempt to squeeze out a little performance, because accessing local variables
         # should be a little faster than class variables. It's probably just a very small
         # optimization, but I didn't verify that claim in this bytedump implementation.
+        # The bound methods that are called for every record (e.g., lines.append) are also
+        # saved in local variables, so the loop doesn't look them up over and over again.
         #
         # NOTE - the selection of the method that's used to generate the actual dump is
         # made by dump(), so that's where to go if you want to modify my choices.
@@ -1094,59 +1392,112 @@ class ByteDump:
             #
             # Compute strings used in the loop and make sure only local variables are used
             # in that loop. Accessing local variables should be slightly faster than class
-            # variables.
+            # variables. Everything is encoded here, so the loop only deals with bytes.
             #
-            addr_prefix = cls.ADDR_prefix
-            addr_format = cls.ADDR_format
-            addr_suffix = cls.ADDR_suffix + cls.ADDR_field_separator
-            byte_prefix = cls.BYTE_indent + cls.BYTE_prefix
-            byte_separator = cls.BYTE_separator
-            byte_suffix = cls.BYTE_suffix + cls.BYTE_field_separator
-            text_prefix = cls.TEXT_indent + cls.TEXT_prefix
-            text_separator = cls.TEXT_separator
-            text_suffix = cls.TEXT_suffix
-            record_separator = cls.DUMP_record_separator
+            addr_prefix = cls.output_bytes(cls.ADDR_prefix)
+            addr_format = cls.output_bytes(cls.ADDR_format)
+            addr_suffix = cls.output_bytes(cls.ADDR_suffix + cls.ADDR_field_separator)
+            byte_prefix = cls.output_bytes(cls.BYTE_indent + cls.BYTE_prefix)
+            byte_separator = cls.output_bytes(cls.BYTE_separator)
+            byte_suffix = cls.output_bytes(cls.BYTE_suffix + cls.BYTE_field_separator)
+            text_prefix = cls.output_bytes(cls.TEXT_indent + cls.TEXT_prefix)
+            text_separator = cls.output_bytes(cls.TEXT_separator)
+            text_suffix = cls.output_bytes(cls.TEXT_suffix)
+            record_separator = cls.output_bytes(cls.DUMP_record_separator)
             record_len = cls.DUMP_record_length
 
             addr_enabled = (cls.ADDR_format is not None and len(cls.ADDR_format) > 0)
             byte_enabled = (cls.byte_map is not None)
             text_enabled = (cls.text_map is not None)
 
-            byte_map = cls.byte_map
-            text_map = cls.text_map
+            byte_map = cls.output_bytes_map(cls.byte_map)
+            text_map = cls.output_bytes_map(cls.text_map)
+
+            #
+            # BYTE fields that are plain hex are built by binascii.hexlify(), so the xxd-style
+            # dumps that most people ask for never look up individual bytes in byte_map.
+            #
+            byte_hex = hex_field_style(byte_map, byte_separator)
+            byte_upper = (byte_hex == "HEX-UPPER")
+
+            #
+            # TEXT fields that map every byte to a single byte and don't use a separator
+            # are built for the whole block by one bytes.translate() call, exactly the way
+            # dump_text_field() does it, and each record just appends a slice of the result.
+            #
+            text_table = translation_table(text_map) if len(text_separator) == 0 else None
+            text = None
 
             # Pre-calculate padding width per byte
             byte_pad_width = 0
             if byte_enabled and cls.BYTE_field_width > 0:
                 byte_pad_width = cls.BYTE_digits_per_octet + cls.BYTE_separator_size
 
+            #
+            # Input is read in blocks that hold as many complete records as will fit in
+            # DUMP_input_maxbuf bytes. All the records in a block are rendered into a list
+            # that's joined and handed to output in a single write, which means the loop
+            # makes one read and one write for thousands of records rather than a handful
+            # of each for every record. Blocks are read, using readinto(), into the same
+            # bytearray, so there's no new input buffer allocated for each block.
+            #
+            # NOTE - blocks are independent (only the starting address changes), so they
+            # could be rendered by a pool of processes. I decided not to, because all the
+            # settings live in class variables that a spawned process wouldn't inherit,
+            # input can be a pipe that has to be read in order, and the xxd-style dumps
+            # that most people ask for are already built by hexlify() and translate().
+            #
+            block_len = max(cls.DUMP_input_maxbuf//record_len, 1)*record_len
             address = cls.DUMP_output_start
 
+            lines = []
+            append = lines.append
+            write = output.write
+
+            block = bytearray(block_len)
+            readinto = input_stream.readinto
+
             while True:
-                buffer = input_stream.read(record_len)
-                count = len(buffer)
-                if count <= 0:
+                size = readinto(block)
+                if not size:
                     break
 
-                if addr_enabled:
-                    output.write(addr_prefix)
-                    output.write(addr_format % address)
-                    output.write(addr_suffix)
+                data = block if size == block_len else block[:size]
+                if text_table is not None:
+                    text = data.translate(text_table)
+                for offset in range(0, size, record_len):
+                    buffer = data[offset:offset + record_len]
+                    count = len(buffer)
+
+                    if addr_enabled:
+                        append(addr_prefix)
+                        append(addr_format % address)
+                        append(addr_suffix)
+
+                    if byte_enabled:
+                        append(byte_prefix)
+                        if byte_hex is not None:
+                            field = hexlify(buffer, byte_separator) if byte_separator else hexlify(buffer)
+                            append(field.upper() if byte_upper else field)
+                        else:
+                            append(byte_separator.join([byte_map[b] for b in buffer]))
+                        if count < record_len and byte_pad_width > 0:
+                            append(b" " * ((record_len - count) * byte_pad_width))
+                        append(byte_suffix)
 
-                if byte_enabled:
-                    output.write(byte_prefix)
-                    output.write(byte_separator.join([byte_map[b] for b in buffer]))
-                    if count < record_len and byte_pad_width > 0:
-                        output.write(" " * ((record_len - count) * byte_pad_width))
-                    output.write(byte_suffix)
+                    if text_enabled:
+                        append(text_prefix)
+                        if text is not None:
+                            append(text[offset:offset + record_len])
+                        else:
+                            append(text_separator.join([text_map[b] for b in buffer]))
+                        append(text_suffix)
 
-                if text_enabled:
-                    output.write(text_prefix)
-                    output.write(text_separator.join([text_map[b] for b in buffer]))
-                    output.write(text_suffix)
+                    append(record_separator)
+                    address += count
 
-                output.write(record_separator)
-                address += count
+                write(b"".join(lines))
+                lines.clear()
 
             output.flush()
         else:
@@ -1155,23 +1506,23 @@ class ByteDump:
     @classmethod
     def dump_all_single_record(cls, input_stream, output) -> None:
         addr_enabled: bool
-        addr_format: str
-        addr_prefix: str
-        addr_suffix: str
+        addr_format: bytes
+        addr_prefix: bytes
+        addr_suffix: bytes
         address: int
         buffer: bytes
         byte_enabled: bool
-        byte_map: list[str] | None
-        byte_separator: str
+        byte_map: list[bytes] | None
+        byte_separator: bytes
         chunk_size: int
-        current_byte_prefix: str
-        current_text_prefix: str
+        current_byte_prefix: bytes
+        current_text_prefix: bytes
         looped: bool
         output_byte: Any
         output_text: Any
         text_enabled: bool
-        text_map: list[str] | None
-        text_separator: str
+        text_map: list[bytes] | None
+        text_separator: bytes
 
         #
         # Dumps the entire input file as a single record. The TEXT field must be buffered
@@ -1184,25 +1535,25 @@ class ByteDump:
         if cls.byte_map is None or cls.text_map is None:
             output_text = output
         else:
-            output_text = StringIO()
+            output_text = BytesIO()
 
         if cls.DUMP_record_length == 0:
-            addr_prefix = cls.ADDR_prefix
-            addr_format = cls.ADDR_format
-            addr_suffix = cls.ADDR_suffix + cls.ADDR_field_separator
+            addr_prefix = cls.output_bytes(cls.ADDR_prefix)
+            addr_format = cls.output_bytes(cls.ADDR_format)
+            addr_suffix = cls.output_bytes(cls.ADDR_suffix + cls.ADDR_field_separator)
 
-            current_byte_prefix = cls.BYTE_indent + cls.BYTE_prefix
-            byte_separator = cls.BYTE_separator
+            current_byte_prefix = cls.output_bytes(cls.BYTE_indent + cls.BYTE_prefix)
+            byte_separator = cls.output_bytes(cls.BYTE_separator)
 
-            current_text_prefix = cls.TEXT_indent + cls.TEXT_prefix
-            text_separator = cls.TEXT_separator
+            current_text_prefix = cls.output_bytes(cls.TEXT_indent + cls.TEXT_prefix)
+            text_separator = cls.output_bytes(cls.TEXT_separator)
 
             addr_enabled = (cls.ADDR_format is not None and len(cls.ADDR_format) > 0)
             byte_enabled = (cls.byte_map is not None)
             text_enabled = (cls.text_map is not None)
 
-            byte_map = cls.byte_map
-            text_map = cls.text_map
+            byte_map = cls.output_bytes_map(cls.byte_map)
+            text_map = cls.output_bytes_map(cls.text_map)
 
             chunk_size = 4096
             address = cls.DUMP_output_start
@@ -1233,28 +1584,39 @@ class ByteDump:
 
             if looped:
                 if byte_enabled:
-                    output.write(cls.BYTE_suffix + cls.BYTE_field_separator)
+                    output.write(cls.output_bytes(cls.BYTE_suffix + cls.BYTE_field_separator))
                     if text_enabled:
                         output.write(output_text.getvalue())
-                        output.write(cls.TEXT_suffix)
+                        output.write(cls.output_bytes(cls.TEXT_suffix))
                 else:
-                    output.write(cls.TEXT_suffix)
+                    output.write(cls.output_bytes(cls.TEXT_suffix))
 
-                output.write(cls.DUMP_record_separator)
+                output.write(cls.output_bytes(cls.DUMP_record_separator))
                 output.flush()
         else:
             cls.internal_error("this method can only be called to dump bytes as a single record")
 
     @classmethod
     def dump_byte_field(cls, input_stream, output) -> None:
-        buffer: bytes
-        byte_map: list[str] | None
-        byte_prefix: str
-        byte_separator: str
-        byte_suffix: str
-        complex_fmt: bool
+        append: Callable[[bytes], None]
+        block: bytearray
+        block_len: int
+        byte_hex: str | None
+        byte_map: list[bytes] | None
+        byte_prefix: bytes
+        byte_separator: bytes
+        byte_stride: int
+        byte_suffix: bytes
+        byte_upper: bool
+        byte_width: int
+        data: bytearray
+        field: bytes
+        lines: list[bytes]
+        offset: int
+        readinto: Callable[[bytearray], int]
         record_len: int
-        record_separator: str
+        size: int
+        write: Callable[[bytes], int]
 
         #
         # Called to produce the dump when the BYTE field is the only field that's supposed
@@ -1262,37 +1624,64 @@ class ByteDump:
         # dump_all() can handle it. However, treating this as an obscure special case means
         # we can eliminate some overhead and that should make this run a little faster.
         #
+        # NOTE - input is read and output is written in blocks, exactly the way it's done
+        # in dump_all(). Records that don't have a prefix, separator, or suffix just use
+        # empty strings, which costs next to nothing now that each block is joined before
+        # it's written.
+        #
 
         if cls.DUMP_record_length > 0:
             if cls.byte_map is not None:
-                byte_map = cls.byte_map
+                byte_map = cls.output_bytes_map(cls.byte_map)
+                byte_prefix = cls.output_bytes(cls.BYTE_indent + cls.BYTE_prefix)
+                byte_separator = cls.output_bytes(cls.BYTE_separator)
+                byte_suffix = cls.output_bytes(cls.BYTE_suffix + cls.DUMP_record_separator)
                 record_len = cls.DUMP_record_length
 
-                complex_fmt = (len(cls.BYTE_separator) > 0 or len(cls.BYTE_prefix) > 0 or
-                               len(cls.BYTE_indent) > 0 or len(cls.BYTE_suffix) > 0)
-
-                if complex_fmt:
-                    byte_prefix = cls.BYTE_indent + cls.BYTE_prefix
-                    byte_separator = cls.BYTE_separator
-                    byte_suffix = cls.BYTE_suffix + cls.DUMP_record_separator
-
-                    while True:
-                        buffer = input_stream.read(record_len)
-                        if not buffer:
-                            break
-
-                        output.write(byte_prefix)
-                        output.write(byte_separator.join([byte_map[b] for b in buffer]))
-                        output.write(byte_suffix)
-                else:
-                    record_separator = cls.DUMP_record_separator
-                    while True:
-                        buffer = input_stream.read(record_len)
-                        if not buffer:
-                            break
+                #
+                # Plain hex BYTE fields, which is what's usually asked for, are built by
+                # binascii.hexlify(), so only the bytes in other BYTE fields are looked up
+                # in byte_map one at a time. hexlify() puts the separator between every
+                # pair of bytes, so it can convert a whole block in one call, and then
+                # each record's field is the byte_width characters that start every
+                # byte_stride characters. The separator that falls between two records
+                # is the only thing that's skipped.
+                #
+                byte_hex = hex_field_style(byte_map, byte_separator)
+                byte_upper = (byte_hex == "HEX-UPPER")
+                byte_stride = record_len*(2 + len(byte_separator))
+                byte_width = byte_stride - len(byte_separator)
+
+                block_len = max(cls.DUMP_input_maxbuf//record_len, 1)*record_len
+                block = bytearray(block_len)
+                readinto = input_stream.readinto
+
+                lines = []
+                append = lines.append
+                write = output.write
+
+                while True:
+                    size = readinto(block)
+                    if not size:
+                        break
+
+                    data = block if size == block_len else block[:size]
+                    if byte_hex is not None:
+                        field = hexlify(data, byte_separator) if byte_separator else hexlify(data)
+                        if byte_upper:
+                            field = field.upper()
+                        for offset in range(0, len(field), byte_stride):
+                            append(byte_prefix)
+                            append(field[offset:offset + byte_width])
+                            append(byte_suffix)
+                    else:
+                        for offset in range(0, size, record_len):
+                            append(byte_prefix)
+                            append(byte_separator.join([byte_map[b] for b in data[offset:offset + record_len]]))
+                            append(byte_suffix)
 
-                        output.write("".join([byte_map[b] for b in buffer]))
-                        output.write(record_separator)
+                    write(b"".join(lines))
+                    lines.clear()
 
                 output.flush()
             else:
@@ -1302,14 +1691,22 @@ class ByteDump:
 
     @classmethod
     def dump_text_field(cls, input_stream, output) -> None:
-        buffer: bytes
-        complex_fmt: bool
+        append: Callable[[bytes], None]
+        block: bytearray
+        block_len: int
+        data: bytearray
+        lines: list[bytes]
+        offset: int
+        readinto: Callable[[bytearray], int]
         record_len: int
-        record_separator: str
-        text_map: list[str] | None
-        text_prefix: str
-        text_separator: str
-        text_suffix: str
+        size: int
+        text: bytearray
+        text_map: list[bytes] | None
+        text_prefix: bytes
+        text_separator: bytes
+        text_suffix: bytes
+        text_table: bytes | None
+        write: Callable[[bytes], int]
 
         #
         # Called to produce the dump when the TEXT field is the only field that's supposed
@@ -1317,37 +1714,55 @@ class ByteDump:
         # dump_all() can handle it. However, treating this as an obscure special case means
         # we can eliminate some overhead and that should make this run a little faster.
         #
+        # NOTE - input is read and output is written in blocks, exactly the way it's done
+        # in dump_all(). Records that don't have a prefix, separator, or suffix just use
+        # empty strings, which costs next to nothing now that each block is joined before
+        # it's written.
+        #
 
         if cls.DUMP_record_length > 0:
             if cls.text_map is not None:
-                text_map = cls.text_map
+                text_map = cls.output_bytes_map(cls.text_map)
+                text_prefix = cls.output_bytes(cls.TEXT_indent + cls.TEXT_prefix)
+                text_separator = cls.output_bytes(cls.TEXT_separator)
+                text_suffix = cls.output_bytes(cls.TEXT_suffix + cls.DUMP_record_separator)
                 record_len = cls.DUMP_record_length
 
-                complex_fmt = (len(cls.TEXT_separator) > 0 or len(cls.TEXT_prefix) > 0 or
-                               len(cls.TEXT_indent) > 0 or len(cls.TEXT_suffix) > 0)
-
-                if complex_fmt:
-                    text_prefix = cls.TEXT_indent + cls.TEXT_prefix
-                    text_separator = cls.TEXT_separator
-                    text_suffix = cls.TEXT_suffix + cls.DUMP_record_separator
-
-                    while True:
-                        buffer = input_stream.read(record_len)
-                        if not buffer:
-                            break
-
-                        output.write(text_prefix)
-                        output.write(text_separator.join([text_map[b] for b in buffer]))
-                        output.write(text_suffix)
-                else:
-                    record_separator = cls.DUMP_record_separator
-                    while True:
-                        buffer = input_stream.read(record_len)
-                        if not buffer:
-                            break
+                #
+                # When every byte maps to a single byte and there's no separator, all the
+                # TEXT fields in a block are built by one bytes.translate() call, and the
+                # records are just slices of the result.
+                #
+                text_table = translation_table(text_map) if len(text_separator) == 0 else None
+
+                block_len = max(cls.DUMP_input_maxbuf//record_len, 1)*record_len
+                block = bytearray(block_len)
+                readinto = input_stream.readinto
+
+                lines = []
+                append = lines.append
+                write = output.write
+
+                while True:
+                    size = readinto(block)
+                    if not size:
+                        break
+
+                    data = block if size == block_len else block[:size]
+                    if text_table is not None:
+                        text = data.translate(text_table)
+                        for offset in range(0, size, record_len):
+                            append(text_prefix)
+                            append(text[offset:offset + record_len])
+                            append(text_suffix)
+                    else:
+                        for offset in range(0, size, record_len):
+                            append(text_prefix)
+                            append(text_separator.join([text_map[b] for b in data[offset:offset + record_len]]))
+                            append(text_suffix)
 
-                        output.write("".join([text_map[b] for b in buffer]))
-                        output.write(record_separator)
+                    write(b"".join(lines))
+                    lines.clear()
 
                 output.flush()
             else:
@@ -1401,6 +1816,8 @@ class ByteDump:
 
     @classmethod
     def initialize1_fields(cls) -> None:
+        conversion: str
+
         #
         # The main job in this method is to check the output styles for the ADDR, BYTE,
         # and TEXT fields that are set after the command line options are processed and
@@ -1414,11 +1831,18 @@ class ByteDump:
 
         cls.DUMP_field_flags = cls.ADDR_field_flag | cls.BYTE_field_flag | cls.TEXT_field_flag
 
+        #
+        # Every style that prints addresses builds ADDR_format the same way, so all the
+        # cases below have to do is pick the conversion character and radix (and maybe
+        # a different default width). The assignments that depend on them are handled
+        # once, after the match statement.
+        #
+
+        conversion = ""
+
         match cls.ADDR_output:
             case "DECIMAL":
-                cls.ADDR_format_width = cls.ADDR_format_width if len(cls.ADDR_format_width) > 0 else cls.ADDR_format_width_default
-                cls.ADDR_format = "%" + cls.ADDR_format_width + "d"
-                cls.ADDR_digits = int(cls.ADDR_format_width)
+                conversion = "d"
                 cls.ADDR_radix = 10
             case "EMPTY":
                 cls.ADDR_format_width = "0"
@@ -1427,29 +1851,27 @@ class ByteDump:
                 cls.ADDR_radix = 0
                 cls.DUMP_field_flags &= ~cls.ADDR_field_flag
             case "HEX-LOWER":
-                cls.ADDR_format_width = cls.ADDR_format_width if len(cls.ADDR_format_width) > 0 else cls.ADDR_format_width_default
-                cls.ADDR_format = "%" + cls.ADDR_format_width + "x"
-                cls.ADDR_digits = int(cls.ADDR_format_width)
+                conversion = "x"
                 cls.ADDR_radix = 16
             case "HEX-UPPER":
-                cls.ADDR_format_width = cls.ADDR_format_width if len(cls.ADDR_format_width) > 0 else cls.ADDR_format_width_default
-                cls.ADDR_format = "%" + cls.ADDR_format_width + "X"
-                cls.ADDR_digits = int(cls.ADDR_format_width)
+                conversion = "X"
                 cls.ADDR_radix = 16
             case "OCTAL":
-                cls.ADDR_format_width = cls.ADDR_format_width if len(cls.ADDR_format_width) > 0 else cls.ADDR_format_width_default
-                cls.ADDR_format = "%" + cls.ADDR_format_width + "o"
-                cls.ADDR_digits = int(cls.ADDR_format_width)
+                conversion = "o"
                 cls.ADDR_radix = 8
             case "XXD":
                 cls.ADDR_output = "HEX-LOWER"
                 cls.ADDR_format_width = cls.ADDR_format_width if len(cls.ADDR_format_width) > 0 else cls.ADDR_format_width_default_xxd
-                cls.ADDR_format = "%" + cls.ADDR_format_width + "x"
-                cls.ADDR_digits = int(cls.ADDR_format_width)
+                conversion = "x"
                 cls.ADDR_radix = 16
             case _:
                 cls.internal_error("address output", delimit(cls.ADDR_output), "has not been implemented")
 
+        if len(conversion) > 0:
+            cls.ADDR_format_width = cls.ADDR_format_width if len(cls.ADDR_format_width) > 0 else cls.ADDR_format_width_default
+            cls.ADDR_format = "%" + cls.ADDR_format_width + conversion
+            cls.ADDR_digits = int(cls.ADDR_format_width)
+
         if cls.ADDR_format_width_limit > 0:
             if cls.ADDR_digits > cls.ADDR_format_width_limit:
                 cls.user_error("address width", delimit(cls.ADDR_format_width), "exceeds the internal limit of", delimit(str(cls.ADDR_format_width_limit)))
@@ -1627,23 +2049,25 @@ class ByteDump:
 
             padding = cls.BYTE_prefix_size - cls.TEXT_prefix_size
             if padding > 0:
-                cls.TEXT_indent = cls.TEXT_indent + f"{'':>{padding}}"
+                cls.TEXT_indent = cls.TEXT_indent + " " * padding
             elif padding < 0:
-                cls.BYTE_indent = cls.BYTE_indent + f"{'':>{-padding}}"
+                cls.BYTE_indent = cls.BYTE_indent + " " * -padding
 
             #
             # Next, modify the separation between individual bytes in the BYTE field
             # or characters in the TEXT field so they all can be lined up vertically
-            # when they're printed on separate lines.
+            # when they're printed on separate lines. The sizes set in initialize1_fields()
+            # just grow by the number of spaces that were added, so there's no reason to
+            # measure the new strings.
             #
 
             padding = cls.BYTE_digits_per_octet - cls.TEXT_chars_per_octet + cls.BYTE_separator_size - cls.TEXT_separator_size
             if padding > 0:
-                cls.TEXT_separator = cls.TEXT_separator + f"{'':>{padding}}"
-                cls.TEXT_separator_size = len(cls.TEXT_separator)
+                cls.TEXT_separator = cls.TEXT_separator + " " * padding
+                cls.TEXT_separator_size += padding
             elif padding < 0:
-                cls.BYTE_separator = cls.BYTE_separator + f"{'':>{-padding}}"
-                cls.BYTE_separator_size = len(cls.BYTE_separator)
+                cls.BYTE_separator = cls.BYTE_separator + " " * -padding
+                cls.BYTE_separator_size -= padding
 
             #
             # Adjust the TEXT field prefix by appending the number of spaces needed
@@ -1653,8 +2077,8 @@ class ByteDump:
 
             padding = cls.BYTE_digits_per_octet - cls.TEXT_chars_per_octet
             if padding > 0:
-                cls.TEXT_prefix = cls.TEXT_prefix + f"{'':>{padding}}"
-                cls.TEXT_prefix_size = len(cls.TEXT_prefix)
+                cls.TEXT_prefix = cls.TEXT_prefix + " " * padding
+                cls.TEXT_prefix_size += padding
             elif padding < 0:
                 cls.internal_error("chars per octet exceeds digits per octet")
 
@@ -1666,7 +2090,7 @@ class ByteDump:
             if cls.ADDR_output != "EMPTY":
                 padding = cls.ADDR_prefix_size + cls.ADDR_digits + cls.ADDR_suffix_size + cls.ADDR_field_separator_size
                 if padding > 0:
-                    cls.TEXT_indent = cls.TEXT_indent + f"{'':>{padding}}"
+                    cls.TEXT_indent = cls.TEXT_indent + " " * padding
 
         elif cls.DUMP_layout != "WIDE":
             cls.internal_error("layout", delimit(cls.DUMP_layout), "has not been implemented")
@@ -1738,8 +2162,16 @@ class ByteDump:
             cls.byte_map = None
 
         if cls.TEXT_map is not None and len(cls.TEXT_map) > 0:
+            #
+            # The four TEXT field mapping arrays declared in this class are tuples that are
+            # shared by every dump, so what we modify here is a list copy of the selected
+            # template. Picking a map really is just a lookup, and the template stays in
+            # its original (unexpanded) form no matter what happens in this method or in
+            # initialize5_attributes().
+            #
             cls.text_map = getattr(cls, cls.TEXT_map, None)
             if cls.text_map is not None:
+                cls.text_map = list(cls.text_map)
                 #
                 # pylint: disable=unsubscriptable-object, unsupported-assignment-operation
                 #
@@ -1753,7 +2185,7 @@ class ByteDump:
                 # an encoding problem and try do something reasonable.
                 #
                 for index, element in enumerate(cls.text_map):
-                    if manager.matched(element, r"^(.*)(\\u([0123456789abcdefABCDEF]{4}))$"):
+                    if element[-6:-4] == "\\u" and manager.matched(element, cls.UNICODE_ESCAPE):
                         codepoint = int(manager.cached_groups[3], 16)
                         try:
                             chr(codepoint).encode(encoding)
@@ -1767,7 +2199,9 @@ class ByteDump:
 
     @classmethod
     def initialize5_attributes(cls) -> None:
-        byte_table: list[str | None]
+        attribute: str | None
+        byte_table: list[str | None] | None
+        escapes: dict[str, str]
         field: str
         field_map: list[str] | None
         index: int
@@ -1775,6 +2209,7 @@ class ByteDump:
         last: int
         layer: str
         manager: RegexManager
+        name: str
         prefix: str
         suffix: str
 
@@ -1782,11 +2217,19 @@ class ByteDump:
         # Applies attributes that were selected by command line options to the active
         # TEXT and BYTE field mapping arrays.
         #
+        # NOTE - the order the tables are applied in matters, because it decides whether
+        # background or foreground escapes end up on the outside of a mapping array element
+        # when a byte has both. The keys are listed explicitly, in the order the Java
+        # version's HashMap hands them back, so the escape sequences we generate match
+        # the ones it generates. Iterating over registered_keys, which is a set, would
+        # leave that decision up to string hashing.
+        #
 
         manager = RegexManager()
         last = last_encoded_byte()
+        suffix = cls.ANSI_ESCAPE.get("RESET.attributes", "")
 
-        for key in cls.attribute_tables.registered_keys:
+        for key in ("BYTE_FOREGROUND", "BYTE_BACKGROUND", "TEXT_BACKGROUND", "TEXT_FOREGROUND"):
             byte_table = cls.attribute_tables.get(key)
             if byte_table is not None:
                 if manager.matched(key, "^(BYTE|TEXT)_(.+)$"):
@@ -1796,19 +2239,30 @@ class ByteDump:
                     field_map = cls.byte_map if field == "BYTE" else cls.text_map
 
                     if field_map is not None:
-                        suffix = cls.ANSI_ESCAPE.get("RESET.attributes", "")
+                        #
+                        # The escape sequences for this layer are pulled out of ANSI_ESCAPE
+                        # once, into a dictionary that's indexed by the attribute names that
+                        # byte_selector() stores in byte_table, so the loop never has to
+                        # build ANSI_ESCAPE keys. The escapes end up embedded in the mapping
+                        # array elements, which means the dump methods never have to deal
+                        # with ANSI_ESCAPE.
+                        #
+                        escapes = {}
+                        for name, prefix in cls.ANSI_ESCAPE.items():
+                            if name.startswith(layer + "."):
+                                escapes[name[len(layer) + 1:]] = prefix
                         #
                         # Right now last is always ends up as 255, but there's a chance that
                         # 127 might occasionally be appropriate (e.g., for ASCII encoding).
-                        # Decided to ignore pylint's suggestion and not make any changes to
-                        # this loop until last_encoded_byte() issues are completely resolved.
+                        # That's why every index is still checked against last, even though
+                        # the loop now uses enumerate() to fetch each table element.
                         #
-                        for index in range(len(byte_table)):            # pylint: disable=consider-using-enumerate
+                        for index, attribute in enumerate(byte_table):
                             if index <= last:
-                                if byte_table[index] is not None and index < len(field_map):
-                                    prefix = cls.ANSI_ESCAPE.get(layer + "." + byte_table[index], "")
+                                if attribute is not None and index < len(field_map):
+                                    prefix = escapes.get(attribute, "")
                                     if len(prefix) > 0:
-                                        field_map[index] = prefix + field_map[index] + suffix
+                                        field_map[index] = f"{prefix}{field_map[index]}{suffix}"
 
     @classmethod
     def main(cls, args: list[str]) -> None:
@@ -1834,7 +2288,6 @@ class ByteDump:
     @classmethod
     def options(cls, args: list[str]) -> None:
         arg: str
-        attribute: str
         done: bool
         format_width: str
         length: str
@@ -1842,8 +2295,8 @@ class ByteDump:
         mode: str
         next_idx: int
         optarg: str
-        selector: str
-        style: str
+        separator: str | None
+        style: str | None
         target: str
 
         #
@@ -1871,38 +2324,18 @@ class ByteDump:
         while next_idx < len(args):
             arg = args[next_idx]
 
-            if manager.matched(arg, "^(--[^=-][^=]*=)(.*)$"):
+            if manager.matched(arg, cls.OPTION_NAME):
                 target = manager.cached_groups[1]
                 optarg = manager.cached_groups[2]
-            elif manager.matched(arg, "^(--[^=-][^=]*)$"):
-                target = manager.cached_groups[1]
-                optarg = ""
             else:
                 target = arg
                 optarg = ""
 
             match target:
                 case "--addr=":
-                    if manager.matched(optarg, "^[ \\t]*(decimal|empty|hex|HEX|octal|xxd)[ \\t]*([:][ \\t]*([0]?[1-9][0-9]*)[ \\t]*)?$"):
-                        style = manager.cached_groups[1]
+                    style = cls.OPTION_ADDR_STYLES.get(manager.cached_groups[1]) if manager.matched(optarg, cls.OPTION_ADDR) else None
+                    if style is not None:
                         format_width = manager.cached_groups[3]
-
-                        match style:
-                            case "decimal":
-                                style = "DECIMAL"
-                            case "empty":
-                                style = "EMPTY"
-                            case "hex":
-                                style = "HEX-LOWER"
-                            case "HEX":
-                                style = "HEX-UPPER"
-                            case "octal":
-                                style = "OCTAL"
-                            case "xxd":
-                                style = "XXD"
-                            case _:
-                                cls.internal_error("option", delimit(arg), "has not been completely implemented")
-
                         cls.ADDR_output = style
                         if format_width is not None:
                             cls.ADDR_format_width = format_width
@@ -1922,40 +2355,12 @@ class ByteDump:
                         cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "contains unprintable characters")
 
                 case "--background=":
-                    if manager.matched(optarg, "^[ \\t]*([a-zA-Z]+([-][a-zA-Z]+)*)[ \\t]*([:][ \\t]*(.*))?$"):
-                        attribute = manager.cached_groups[1]
-                        selector = manager.cached_groups[4] if manager.cached_groups[3] is not None else "0x(00-FF)"
-                        if f"BACKGROUND.{attribute}" in cls.ANSI_ESCAPE:
-                            cls.byte_selector(attribute, selector, cls.attribute_tables.get_table("BYTE_BACKGROUND"))
-                            cls.byte_selector(attribute, selector, cls.attribute_tables.get_table("TEXT_BACKGROUND"))
-                        else:
-                            cls.user_error("background attribute", delimit(attribute), "in option", delimit(arg), "is not recognized")
-                    else:
-                        cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
+                    cls.attribute_option(arg, optarg, "BACKGROUND", "BYTE_BACKGROUND", "TEXT_BACKGROUND")
 
                 case "--byte=":
-                    if manager.matched(optarg, "^[ \\t]*(binary|decimal|empty|hex|HEX|octal|xxd)[ \\t]*([:][ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*)?$"):
-                        style = manager.cached_groups[1]
+                    style = cls.OPTION_BYTE_STYLES.get(manager.cached_groups[1]) if manager.matched(optarg, cls.OPTION_STYLE) else None
+                    if style is not None:
                         length = manager.cached_groups[3]
-
-                        match style:
-                            case "binary":
-                                style = "BINARY"
-                            case "decimal":
-                                style = "DECIMAL"
-                            case "empty":
-                                style = "EMPTY"
-                            case "hex":
-                                style = "HEX-LOWER"
-                            case "HEX":
-                                style = "HEX-UPPER"
-                            case "octal":
-                                style = "OCTAL"
-                            case "xxd":
-                                style = "XXD"
-                            case _:
-                                cls.internal_error("option", delimit(arg), "has not been completely implemented")
-
                         cls.BYTE_output = style
                         if length is not None:
                             #
@@ -1969,26 +2374,10 @@ class ByteDump:
                         cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
 
                 case "--byte-background=":
-                    if manager.matched(optarg, "^[ \\t]*([a-zA-Z]+([-][a-zA-Z]+)*)[ \\t]*([:][ \\t]*(.*))?$"):
-                        attribute = manager.cached_groups[1]
-                        selector = manager.cached_groups[4] if manager.cached_groups[3] is not None else "0x(00-FF)"
-                        if f"BACKGROUND.{attribute}" in cls.ANSI_ESCAPE:
-                            cls.byte_selector(attribute, selector, cls.attribute_tables.get_table("BYTE_BACKGROUND"))
-                        else:
-                            cls.user_error("background attribute", delimit(attribute), "in option", delimit(arg), "is not recognized")
-                    else:
-                        cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
+                    cls.attribute_option(arg, optarg, "BACKGROUND", "BYTE_BACKGROUND")
 
                 case "--byte-foreground=":
-                    if manager.matched(optarg, "^[ \\t]*([a-zA-Z]+([-][a-zA-Z]+)*)[ \\t]*([:][ \\t]*(.*))?$"):
-                        attribute = manager.cached_groups[1]
-                        selector = manager.cached_groups[4] if manager.cached_groups[3] is not None else "0x(00-FF)"
-                        if f"FOREGROUND.{attribute}" in cls.ANSI_ESCAPE:
-                            cls.byte_selector(attribute, selector, cls.attribute_tables.get_table("BYTE_FOREGROUND"))
-                        else:
-                            cls.user_error("foreground attribute", delimit(attribute), "in option", delimit(arg), "is not recognized")
-                    else:
-                        cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
+                    cls.attribute_option(arg, optarg, "FOREGROUND", "BYTE_FOREGROUND")
 
                 case "--byte-prefix=":
                     if is_user_printable(optarg):
@@ -2031,29 +2420,20 @@ class ByteDump:
                                     cls.user_error("debugging mode", delimit(mode), "in option", delimit(arg), "is not recognized")
 
                 case "--foreground=":
-                    if manager.matched(optarg, "^[ \\t]*([a-zA-Z]+([-][a-zA-Z]+)*)[ \\t]*([:][ \\t]*(.*))?$"):
-                        attribute = manager.cached_groups[1]
-                        selector = manager.cached_groups[4] if manager.cached_groups[3] is not None else "0x(00-FF)"
-                        if f"FOREGROUND.{attribute}" in cls.ANSI_ESCAPE:
-                            cls.byte_selector(attribute, selector, cls.attribute_tables.get_table("BYTE_FOREGROUND"))
-                            cls.byte_selector(attribute, selector, cls.attribute_tables.get_table("TEXT_FOREGROUND"))
-                        else:
-                            cls.user_error("foreground attribute", delimit(attribute), "in option", delimit(arg), "is not recognized")
-                    else:
-                        cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
+                    cls.attribute_option(arg, optarg, "FOREGROUND", "BYTE_FOREGROUND", "TEXT_FOREGROUND")
 
                 case "--help":
                     cls.help()
                     Terminator.terminate()
 
                 case "--length=":
-                    if manager.matched(optarg, "^[ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*$"):
+                    if manager.matched(optarg, cls.OPTION_COUNT):
                         cls.DUMP_record_length = int(manager.cached_groups[1], 0)
                     else:
                         cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
 
                 case "--length-limit=":         # undocumented option
-                    if manager.matched(optarg, "^[ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*$"):
+                    if manager.matched(optarg, cls.OPTION_COUNT):
                         cls.DUMP_record_length_limit = int(manager.cached_groups[1], 0)
                     else:
                         cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
@@ -2066,27 +2446,23 @@ class ByteDump:
                     cls.DUMP_layout = "NARROW"
 
                 case "--read=":
-                    if manager.matched(optarg, "^[ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*$"):
+                    if manager.matched(optarg, cls.OPTION_COUNT):
                         cls.DUMP_input_read = int(manager.cached_groups[1], 0)
                     else:
                         cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
 
                 case "--spacing=":
-                    if manager.matched(optarg, "^[ \\t]*(1|single|2|double|3|triple)[ \\t]*$"):
-                        match manager.cached_groups[1]:
-                            case "1" | "single":
-                                cls.DUMP_record_separator = "\n"
-                            case "2" | "double":
-                                cls.DUMP_record_separator = "\n\n"
-                            case "3" | "triple":
-                                cls.DUMP_record_separator = "\n\n\n"
-                            case _:
-                                cls.internal_error("option", delimit(arg), "has not been completely implemented")
+                    if manager.matched(optarg, cls.OPTION_SPACING):
+                        separator = cls.OPTION_SPACING_SEPARATORS.get(manager.cached_groups[1])
+                        if separator is not None:
+                            cls.DUMP_record_separator = separator
+                        else:
+                            cls.internal_error("option", delimit(arg), "has not been completely implemented")
                     else:
                         cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
 
                 case "--start=":
-                    if manager.matched(optarg, "^[ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*([:][ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*)?$"):
+                    if manager.matched(optarg, cls.OPTION_START):
                         cls.DUMP_input_start = int(manager.cached_groups[1], 0)
                         if manager.cached_groups[3] is not None:
                             cls.DUMP_output_start = int(manager.cached_groups[3], 0)
@@ -2096,26 +2472,9 @@ class ByteDump:
                         cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
 
                 case "--text=":
-                    if manager.matched(optarg, "^[ \\t]*(ascii|caret|empty|escape|unicode|xxd)[ \\t]*([:][ \\t]*([1-9][0-9]*|0[xX][0-9a-fA-F]+|0[0-7]*)[ \\t]*)?$"):
-                        style = manager.cached_groups[1]
+                    style = cls.OPTION_TEXT_STYLES.get(manager.cached_groups[1]) if manager.matched(optarg, cls.OPTION_STYLE) else None
+                    if style is not None:
                         length = manager.cached_groups[3]
-
-                        match style:
-                            case "ascii":
-                                style = "ASCII"
-                            case "caret":
-                                style = "CARET"
-                            case "empty":
-                                style = "EMPTY"
-                            case "escape":
-                                style = "CARET_ESCAPE"
-                            case "unicode":
-                                style = "UNICODE"
-                            case "xxd":
-                                style = "XXD"
-                            case _:
-                                cls.internal_error("option", delimit(arg), "has not been completely implemented")
-
                         cls.TEXT_output = style
                         if length is not None:
                             #
@@ -2129,26 +2488,10 @@ class ByteDump:
                         cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
 
                 case "--text-background=":
-                    if manager.matched(optarg, "^[ \\t]*([a-zA-Z]+([-][a-zA-Z]+)*)[ \\t]*([:][ \\t]*(.*))?$"):
-                        attribute = manager.cached_groups[1]
-                        selector = manager.cached_groups[4] if manager.cached_groups[3] is not None else "0x(00-FF)"
-                        if f"BACKGROUND.{attribute}" in cls.ANSI_ESCAPE:
-                            cls.byte_selector(attribute, selector, cls.attribute_tables.get_table("TEXT_BACKGROUND"))
-                        else:
-                            cls.user_error("background attribute", delimit(attribute), "in option", delimit(arg), "is not recognized")
-                    else:
-                        cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
+                    cls.attribute_option(arg, optarg, "BACKGROUND", "TEXT_BACKGROUND")
 
                 case "--text-foreground=":
-                    if manager.matched(optarg, "^[ \\t]*([a-zA-Z]+([-][a-zA-Z]+)*)[ \\t]*([:][ \\t]*(.*))?$"):
-                        attribute = manager.cached_groups[1]
-                        selector = manager.cached_groups[4] if manager.cached_groups[3] is not None else "0x(00-FF)"
-                        if f"FOREGROUND.{attribute}" in cls.ANSI_ESCAPE:
-                            cls.byte_selector(attribute, selector, cls.attribute_tables.get_table("TEXT_FOREGROUND"))
-                        else:
-                            cls.user_error("foreground attribute", delimit(attribute), "in option", delimit(arg), "is not recognized")
-                    else:
-                        cls.user_error("argument", delimit(optarg), "in option", delimit(arg), "is not recognized")
+                    cls.attribute_option(arg, optarg, "FOREGROUND", "TEXT_FOREGROUND")
 
                 case "--text-prefix=":
                     if is_user_printable(optarg):
@@ -2188,6 +2531,27 @@ class ByteDump:
 
         cls.arguments_consumed = next_idx
 
+    @classmethod
+    def output_bytes(cls, arg: str) -> bytes:
+        #
+        # The dump methods write bytes, so strings have to be encoded before they're
+        # written. dump() picks output_encoding and output_errors, and when the bytes
+        # go straight to the binary stream under sys.stdout they're the encoding and
+        # error handler attached to sys.stdout, which means we get exactly the bytes
+        # that print() would have produced.
+        #
+
+        return arg.encode(cls.output_encoding, cls.output_errors)
+
+    @classmethod
+    def output_bytes_map(cls, field_map: list[str] | None) -> list[bytes] | None:
+        #
+        # Encodes every string in a BYTE or TEXT field mapping array. It's done once, right
+        # before a dump starts, so the loops that generate the dump only work with bytes.
+        #
+
+        return [cls.output_bytes(element) for element in field_map] if field_map is not None else None
+
     @classmethod
     def setup(cls) -> None:
         #
@@ -2196,6 +2560,12 @@ class ByteDump:
         # uses the AttributeTables constructor, so it's done here just to make sure
         # it doesn't depend on exactly where that class is defined.
         #
+        # NOTE - the tables start out empty and are filled in by options(), so there's
+        # nothing that could be usefully cached and shared here. What ends up in them
+        # depends on every attribute option in the command line, each run builds them
+        # exactly once, and initialize5_attributes() applies them once to the mapping
+        # arrays that are used by the dump.
+        #
 
         cls.attribute_tables = AttributeTables(
             "BYTE_BACKGROUND", "BYTE_FOREGROUND",
@@ -2220,7 +2590,7 @@ class ByteDump:
             "+exit",
             "+frame",
             "--",
-            " ".join(args)
+            *args
         )
 
     @classmethod
@@ -2235,7 +2605,7 @@ class ByteDump:
             "+exit",
             "+frame",
             "--",
-            " ".join(args)
+            *args
         )
 
     @classmethod
@@ -2250,7 +2620,7 @@ class ByteDump:
             "+exit",
             "+frame",
             "--",
-            " ".join(args)
+            *args
         )
 
 ###################################
@@ -2267,6 +2637,42 @@ def delimit(arg: Any) -> str:
 
     return "\"" + " ".join(arg) + "\"" if isinstance(arg, list) else f"\"{str(arg)}\""
 
+def hex_field_style(field_map: list[bytes] | None, separator: bytes) -> str | None:
+    #
+    # Returns "HEX-LOWER" or "HEX-UPPER" when field_map is an encoded BYTE field mapping
+    # array that hasn't been decorated by attributes and is exactly what binascii.hexlify()
+    # (followed by upper() for "HEX-UPPER") would produce for each byte, and separator is
+    # one that hexlify() accepts. None is returned when hexlify() can't be used to build
+    # the BYTE field.
+    #
+
+    if field_map is not None and len(separator) <= 1:
+        if field_map == [b"%02x" % index for index in range(256)]:
+            return "HEX-LOWER"
+        if field_map == [b"%02X" % index for index in range(256)]:
+            return "HEX-UPPER"
+    return None
+
+def is_byte_safe_encoding(encoding: str) -> bool:
+    #
+    # Returns True when strings that are encoded separately, using encoding, can be
+    # joined and written as bytes and end up exactly the way they would if they were
+    # joined and encoded as one string. That rules out encodings, like utf-16 or
+    # utf-8-sig, that add byte order marks, ones that aren't ASCII compatible, and
+    # stateful ones, like utf-7 or iso2022_jp, that use shift sequences.
+    #
+
+    sample = "\u00E9\u3042"
+
+    try:
+        return (
+            "".encode(encoding) == b"" and
+            "%x\n".encode(encoding) == b"%x\n" and
+            sample.encode(encoding, "replace")*2 == (sample*2).encode(encoding, "replace")
+        )
+    except LookupError:
+        return False
+
 def is_user_printable(arg: str) -> bool:
     #
     # Just used to make sure that all of the characters in the strings that a user can
@@ -2279,6 +2685,13 @@ def is_user_printable(arg: str) -> bool:
     #
 
     if arg.isprintable():
+        #
+        # Printable ASCII characters can be encoded by every locale's preferred encoding,
+        # so the usual arguments (which are plain ASCII) never need the locale lookup or
+        # the trial encode() call.
+        #
+        if arg.isascii():
+            return True
         try:
             #
             # I think this part works - the Python UTF-8 Mode documentation seems to
@@ -2301,6 +2714,17 @@ def last_encoded_byte() -> int:
 
     return 255
 
+def translation_table(field_map: list[bytes] | None) -> bytes | None:
+    #
+    # Returns the table that bytes.translate() needs to reproduce what field_map does
+    # when every element in field_map is a single byte, otherwise None is returned.
+    #
+
+    if field_map is not None and len(field_map) == 256:
+        if all(len(element) == 1 for element in field_map):
+            return b"".join(field_map)
+    return None
+
 ###################################
 #
 # Helper Classes
@@ -2314,10 +2738,15 @@ class RegexManager:
     # Caching groups recognized by matched() means the program doesn't have to call
     # matched_groups() to get them.
     #
+    # NOTE - the groups are a tuple, with the full match in front of the groups that
+    # the match object hands back, so group numbers can be used directly as indices.
+    # Building the tuple is cheaper than building a list, and nobody changes them.
+    #
 
-    cached_groups: list[str] | None = None
+    cached_groups: tuple[str | None, ...] | None = None
+    cached_end: int = 0
 
-    def matched(self, text: str, regex: str) -> bool:
+    def matched(self, text: str, regex: str | re.Pattern) -> bool:
         #
         # This currently is the only method that caches matched groups. It helped us
         # simplify some of the regex matching code (without use of the := assignment
@@ -2327,8 +2756,25 @@ class RegexManager:
         self.cached_groups = self.matched_groups(text, regex)
         return self.cached_groups is not None
 
-    def matched_group(self, group_index: int, text: str, regex: str) -> str | None:
-        groups: list[str]
+    def matched_at(self, text: str, regex: re.Pattern, pos: int, endpos: int) -> bool:
+        match: re.Match | None
+
+        #
+        # Like matched(), except the match must start at pos and text is treated as if
+        # it ended at endpos. Where the match ends is cached in cached_end, so a caller
+        # can step through text without slicing off the parts it's already processed.
+        #
+
+        match = regex.match(text, pos, endpos) if text is not None else None
+        if match:
+            self.cached_groups = (match.group(0),) + match.groups()
+            self.cached_end = match.end()
+        else:
+            self.cached_groups = None
+        return self.cached_groups is not None
+
+    def matched_group(self, group_index: int, text: str, regex: str | re.Pattern) -> str | None:
+        groups: tuple[str | None, ...] | None
 
         #
         # No group caching by this method, at least right now. Not 100% convinced it's
@@ -2339,7 +2785,7 @@ class RegexManager:
         groups = self.matched_groups(text, regex)
         return groups[group_index] if groups and group_index < len(groups) else None
 
-    def matched_groups(self, text: str, regex: str) -> list[str] | None:        # pylint: disable=no-self-use
+    def matched_groups(self, text: str, regex: str | re.Pattern) -> tuple[str | None, ...] | None:        # pylint: disable=no-self-use
         match: re.Match
 
         #
@@ -2347,11 +2793,15 @@ class RegexManager:
         # the right approach, but it's also not unreasonable because this RegexManager
         # class was only designed to be be used by the ByteDump class.
         #
+        # NOTE - regex can be a string or a compiled pattern. Searching with a compiled
+        # pattern skips the lookup in the cache that the re module maintains for the
+        # patterns it has already compiled.
+        #
 
         if text is not None and regex is not None:
-            match = re.search(regex, text)
+            match = regex.search(text) if isinstance(regex, re.Pattern) else re.search(regex, text)
             if match:
-                return [match.group(0)] + list(match.groups())
+                return (match.group(0),) + match.groups()
         return None
 
 class Terminator:
@@ -2379,6 +2829,15 @@ class Terminator:
 
     DEFAULT_EXIT_STATUS: int = 1
 
+    #
+    # Pattern that recognizes the +name, -name, and -name=value options that can be
+    # included in the arguments of error_handler() and message_formatter(). It's used
+    # for every argument that either method sees, so it's compiled once, when the class
+    # is loaded.
+    #
+
+    OPTION_PATTERN: re.Pattern = re.compile("^(([+-])[^=+-][^=]*)(([=])(.*))?$")
+
     ###################################
     #
     # Terminator Methods
@@ -2429,7 +2888,7 @@ class Terminator:
 
         while index < len(args):
             arg = args[index]
-            if manager.matched(arg, "^(([+-])[^=+-][^=]*)(([=])(.*))?$"):
+            if manager.matched(arg, cls.OPTION_PATTERN):
                 target = manager.cached_groups[1]
                 opttag = manager.cached_groups[2]
                 optarg = manager.cached_groups[5]
@@ -2489,20 +2948,20 @@ class Terminator:
         arg: str
         caller: dict[str, str]
         done: bool
-        frame_info: inspect.FrameInfo
+        frame: FrameType | None
         frame_offset: int
-        groups: list[str] | None
+        groups: tuple[str | None, ...] | None
         index: int
         info: str | None
         manager: RegexManager
         message: str | None
         optarg: str
         opttag: str
+        parts: list[str]
         prefix: str | None
-        result: str
-        stack: list[inspect.FrameInfo]
         suffix: str | None
         tag: str | None
+        tags: list[str]
         target: str
         token: str
 
@@ -2527,7 +2986,7 @@ class Terminator:
 
         while index < len(args):
             arg = args[index]
-            groups = manager.matched_groups(arg, "^(([+-])[^=+-][^=]*)(([=])(.*))?$")
+            groups = manager.matched_groups(arg, cls.OPTION_PATTERN)
             if groups is not None:
                 target = groups[1]
                 opttag = groups[2]
@@ -2569,59 +3028,57 @@ class Terminator:
             message = " ".join(args[index:])
 
         if info is not None:
-            stack = inspect.stack()
+            #
+            # Only one frame is needed, so it's fetched directly. inspect.stack() would
+            # build a FrameInfo for every frame on the stack, and it reads the source file
+            # of each one, just so we could pick out one line number, method, and file.
+            #
+            try:
+                frame = sys._getframe(frame_offset)         # pylint: disable=protected-access
+            except ValueError:
+                frame = None
 
-            if frame_offset < len(stack):
-                frame_info = stack[frame_offset]
+            if frame is not None:
                 caller = {}
-                caller[cls.FRAME_LINE] = str(frame_info.lineno) if frame_info.lineno > 0 else cls.UNKNOWN_LINE_TAG
-                caller[cls.FRAME_METHOD] = frame_info.function
-                caller[cls.FRAME_SOURCE] = os.path.basename(frame_info.filename)
+                caller[cls.FRAME_LINE] = str(frame.f_lineno) if frame.f_lineno > 0 else cls.UNKNOWN_LINE_TAG
+                caller[cls.FRAME_METHOD] = frame.f_code.co_name
+                caller[cls.FRAME_SOURCE] = os.path.basename(frame.f_code.co_filename)
 
-                tag = tag if tag is not None else ""
+                tags = [tag] if tag is not None and len(tag) > 0 else []
                 for token in info.split(","):
                     match token.strip().upper():
                         case cls.CALLER_INFO:
-                            tag = "".join([
-                                tag + "] [" if len(tag) > 0 else "",
-                                f"{caller[cls.FRAME_SOURCE]}; {caller[cls.FRAME_METHOD]}; Line {caller[cls.FRAME_LINE]}"
-                            ])
+                            tags.append(f"{caller[cls.FRAME_SOURCE]}; {caller[cls.FRAME_METHOD]}; Line {caller[cls.FRAME_LINE]}")
 
                         case cls.LINE_INFO:
-                            tag = "".join([
-                                tag + "] [" if len(tag) > 0 else "",
-                                f"Line {caller[cls.FRAME_LINE]}"
-                            ])
+                            tags.append(f"Line {caller[cls.FRAME_LINE]}")
 
                         case cls.LOCATION_INFO:
-                            tag = "".join([
-                                tag + "] [" if len(tag) > 0 else "",
-                                f"{caller[cls.FRAME_SOURCE]}; Line {caller[cls.FRAME_LINE]}"
-                            ])
+                            tags.append(f"{caller[cls.FRAME_SOURCE]}; Line {caller[cls.FRAME_LINE]}")
 
                         case cls.METHOD_INFO:
-                            tag = "".join([
-                                tag + "] [" if len(tag) > 0 else "",
-                                caller[cls.FRAME_METHOD]
-                            ])
+                            tags.append(caller[cls.FRAME_METHOD])
 
                         case cls.SOURCE_INFO:
-                            tag = "".join([
-                                tag + "] [" if len(tag) > 0 else "",
-                                caller[cls.FRAME_SOURCE]
-                            ])
+                            tags.append(caller[cls.FRAME_SOURCE])
+                tag = "] [".join(tags)
+
+        #
+        # The pieces of the final message are collected in a list and joined once, which
+        # is how the tags were handled too.
+        #
 
-        result = ""
+        parts = []
         if prefix is not None and len(prefix) > 0:
-            result += prefix + ": "
+            parts.append(prefix + ": ")
         if message is not None and len(message) > 0:
-            result += message + " "
+            parts.append(message + " ")
         if tag is not None and len(tag) > 0:
-            result += "[" + tag + "]"
+            parts.append("[" + tag + "]")
         if suffix is not None and len(suffix) > 0:
-            result += suffix
+            parts.append(suffix)
 
-        return result
+        return "".join(parts)
 
     @classmethod
     def terminate(cls, message: str | None = "", cause: BaseException | None = None,
@@ -2689,6 +3146,12 @@ class AttributeTables(dict):
     # options in the bash and Java implementations if you want more details. This
     # definitely not a class that you should spend much effort on.
     #
+    # NOTE - the tables are plain lists of attribute names (or None) and there's no
+    # reason to pack them into something like a bytearray of attribute ids. They're
+    # only read once, by initialize5_attributes(), which folds the escape sequences
+    # into the mapping arrays before the dump starts, so nothing that happens while
+    # bytes are dumped ever looks at these tables.
+    #
 
     TABLE_SIZE: int = 256               # one attribute slot for each byte
 
@@ -2720,10 +3183,8 @@ class AttributeTables(dict):
             raise ValueError("constructor requires at least one argument")
 
     def dump_table(self, key: str, prefix: str) -> None:
-        count: int
-        elements: str
+        elements: list[str]
         index: int
-        separator: str
         table: list[str | None]
         value: str | None
 
@@ -2737,21 +3198,15 @@ class AttributeTables(dict):
 
         table = self.get(key)
         if table is not None:
-            count = 0
             prefix = prefix if prefix is not None else ""
-            elements = ""
-            separator = ""
+            elements = []
 
             for index, value in enumerate(table):
                 if value is not None:
-                    elements += f"{separator}{prefix}  {'[' + str(index) + ']':>5}=\"{value}\""
-                    separator = "\n"
-                    count += 1
+                    elements.append(f"{prefix}  {'[' + str(index) + ']':>5}=\"{value}\"\n")
 
-            if count > 0:
-                sys.stderr.write(f"{prefix}{key}[{count}]:\n")
-                sys.stderr.write(f"{elements}\n")
-                sys.stderr.write("\n")
+            if len(elements) > 0:
+                sys.stderr.write(f"{prefix}{key}[{len(elements)}]:\n" + "".join(elements) + "\n")
 
     def get_table(self, key: str) -> list[str | None]:
         table: list[str | None]
@@ -2760,21 +3215,45 @@ class AttributeTables(dict):
         # Returns the table that is (or soon will be) associated with key, but only if
         # key is in registered_keys. The table is created and added to this dict if it's
         # not there yet, which should only happen on the first request for key's table.
+        # The constructor refuses None, so a key that's in registered_keys can't be None
+        # and doesn't need to be checked again.
         #
 
         if key in self.registered_keys:
-            if key is not None:
-                table = self.get(key)
-                if table is None:
-                    table = [None] * self.TABLE_SIZE
-                    self[key] = table
-            else:
-                raise ValueError("Key cannot be None")
+            table = self[key]
+            if table is None:
+                table = [None] * self.TABLE_SIZE
+                self[key] = table
         else:
             raise ValueError(f"{key} is not a key that was registered by the constructor.")
 
         return table
 
+class TextStreamWriter:
+    #
+    # Lets the dump methods, which only write bytes, send their output to a text stream
+    # that can't take those bytes directly (e.g., io.StringIO). Every block of bytes is
+    # decoded using the encoding and error handler output_bytes() used, so the text
+    # stream ends up with exactly the strings that were encoded. Every write ends on
+    # the boundary between two encoded strings, so characters are never split.
+    #
+
+    encoding: str = "utf-8"
+    errors: str = "strict"
+    stream: Any = None
+
+    def __init__(self, stream: Any, encoding: str, errors: str):
+        self.stream = stream
+        self.encoding = encoding
+        self.errors = errors
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def write(self, data: bytes) -> int:
+        self.stream.write(data.decode(self.encoding, self.errors))
+        return len(data)
+
 ###################################
 #
 # Documentation